@@ -23,7 +23,8 @@ VERSION_STRING = "1.0"
 LCD_WIDTH = 96
 LCD_HEIGHT = 16
 LCD_NUM_BYTES = LCD_WIDTH * LCD_HEIGHT // 8
-LCD_PAGE_SIZE = 1024
+# Current IronOS firmware only plays back the first 1024 bytes of the logo region
+LOGO_PLAYBACK_SIZE = 1024
 
 DATA_PROGRAMMED_MARKER = 0xAA
 FULL_FRAME_MARKER = 0xFF
@@ -34,6 +35,7 @@ EMPTY_FRAME_MARKER = (
 
 class MiniwareSettings:
     IMAGE_ADDRESS = 0x0800F800
+    LOGO_REGION_SIZE = 1024
     DFU_TARGET_NAME = b"IronOS-dfu"
     DFU_ALT = 0
     DFU_VENDOR = 0x1209
@@ -43,24 +45,27 @@ class MiniwareSettings:
 
 class S60Settings:
     IMAGE_ADDRESS = 0x08000000 + (62 * 1024)
+    LOGO_REGION_SIZE = 1024
     DFU_TARGET_NAME = b"IronOS-dfu"
     DFU_ALT = 0
     DFU_VENDOR = 0x1209
     DFU_PRODUCT = 0xDB42
-    MINIMUM_HEX_SIZE = 1024
+    MINIMUM_HEX_SIZE = LOGO_REGION_SIZE
 
 
 class TS101Settings:
     IMAGE_ADDRESS = 0x08000000 + (99 * 1024)
+    LOGO_REGION_SIZE = 1024
     DFU_TARGET_NAME = b"IronOS-dfu"
     DFU_ALT = 0
     DFU_VENDOR = 0x1209
     DFU_PRODUCT = 0xDB42
-    MINIMUM_HEX_SIZE = 1024
+    MINIMUM_HEX_SIZE = LOGO_REGION_SIZE
 
 
 class MHP30Settings:
     IMAGE_ADDRESS = 0x08000000 + (126 * 1024)
+    LOGO_REGION_SIZE = 1024
     DFU_TARGET_NAME = b"IronOS-dfu"
     DFU_ALT = 0
     DFU_VENDOR = 0x1209
@@ -70,20 +75,22 @@ class MHP30Settings:
 
 class PinecilSettings:
     IMAGE_ADDRESS = 0x0801F800
+    LOGO_REGION_SIZE = 1024
     DFU_TARGET_NAME = b"Pinecil"
     DFU_ALT = 0
     DFU_VENDOR = 0x28E9
     DFU_PRODUCT = 0x0189
-    MINIMUM_HEX_SIZE = 1024
+    MINIMUM_HEX_SIZE = LOGO_REGION_SIZE
 
 
 class Pinecilv2Settings:
     IMAGE_ADDRESS = 1016 * 1024  # its 2 4k erase pages inset
+    LOGO_REGION_SIZE = 4 * 1024  # One 4k erase page, the last page holds the settings
     DFU_TARGET_NAME = b"Pinecilv2"
     DFU_ALT = 0
     DFU_VENDOR = 0x28E9  # These are ignored by blisp so doesnt matter what we use
     DFU_PRODUCT = 0x0189  # These are ignored by blisp so doesnt matter what we use
-    MINIMUM_HEX_SIZE = 1024
+    MINIMUM_HEX_SIZE = LOGO_REGION_SIZE
 
 
 def still_image_to_bytes(
@@ -165,7 +172,12 @@ def get_screen_blob(previous_frame: bytearray, this_frame: bytearray):
 
 
 def animated_image_to_bytes(
-    imageIn: Image, negative: bool, dither: bool, threshold: int, flip_frames
+    imageIn: Image,
+    negative: bool,
+    dither: bool,
+    threshold: int,
+    flip_frames,
+    max_size: int,
 ):
     """
     Convert the gif into our best effort startup animation
@@ -178,6 +190,8 @@ def animated_image_to_bytes(
     But if we delta encode; we can make far more frames of animation for _some_ types of animations.
     This means reveals are better than moves.
     Data is stored in the byte blobs, so if you change one pixel, changing another pixel in that column on that row is "free"
+
+    Frames are added until the output would exceed `max_size` bytes
     """
 
     frameData = []
@@ -232,15 +246,24 @@ def animated_image_to_bytes(
     """
     for id in range(1, len(frameData)):
         frameBlob = get_screen_blob(frameData[id - 1], frameData[id])
-        if (len(outputData) + len(frameBlob)) > LCD_PAGE_SIZE:
+        if (len(outputData) + len(frameBlob)) > max_size:
             print(f"Truncating animation after {id} frames as we are out of space")
             break
         print(f"Frame {id + 1} encoded to {len(frameBlob)} bytes")
         outputData.extend(frameBlob)
-    print(f"Total size used: {len(outputData)} of 1024 bytes")
+    print(f"Total size used: {len(outputData)} of {max_size} bytes")
     return outputData
 
 
+def pad_to_region(data: list[int], region_size: int):
+    """
+    Pads the logo data out to cover the whole logo region, so that no stale
+    frames from an older logo remain in the erased flash
+    """
+    assert len(data) <= region_size
+    return data + [0] * (region_size - len(data))
+
+
 def img2hex(
     input_filename,
     device_model_name: str,
@@ -252,6 +275,7 @@ def img2hex(
     make_erase_image=False,
     output_filename_base="out",
     flip=False,
+    use_full_region=False,
 ):
     """
     Convert 'input_filename' image file into Intel hex format with data
@@ -266,32 +290,10 @@ def img2hex(
         dithering algorithm used.
     Optional `negative' inverts black/white regardless of input image type
         or other options.
+    Optional `use_full_region' lets animations use the whole logo region of
+        the device instead of the first 1024 bytes; this needs firmware that
+        plays back the whole region.
     """
-    if make_erase_image:
-        data = [0xFF] * 1024
-    else:
-        try:
-            image = Image.open(input_filename)
-        except BaseException as e:
-            raise IOError('error reading image file "{}": {}'.format(input_filename, e))
-
-        if getattr(image, "is_animated", False):
-            data = animated_image_to_bytes(image, negative, dither, threshold, flip)
-        else:
-            if flip:
-                image = image.rotate(180)
-            # magic/required header
-            data = [DATA_PROGRAMMED_MARKER, 0x00]  # Timing value of 0
-            image_bytes = still_image_to_bytes(
-                image, negative, dither, threshold, preview_filename
-            )
-            data.extend(get_screen_blob([0] * LCD_NUM_BYTES, image_bytes))
-
-    # Pad up to the full page size
-    if len(data) < LCD_PAGE_SIZE:
-        pad = [0] * (LCD_PAGE_SIZE - len(data))
-        data.extend(pad)
-
     # Set device settings depending on input `-m` argument
     device_name = device_model_name.lower()
     if (
@@ -320,6 +322,39 @@ def img2hex(
         print("Could not determine device type")
         sys.exit(-1)
 
+    if make_erase_image:
+        data = [0xFF] * deviceSettings.LOGO_REGION_SIZE
+    else:
+        try:
+            image = Image.open(input_filename)
+        except BaseException as e:
+            raise IOError('error reading image file "{}": {}'.format(input_filename, e))
+
+        if getattr(image, "is_animated", False):
+            data = animated_image_to_bytes(
+                image,
+                negative,
+                dither,
+                threshold,
+                flip,
+                (
+                    deviceSettings.LOGO_REGION_SIZE
+                    if use_full_region
+                    else min(LOGO_PLAYBACK_SIZE, deviceSettings.LOGO_REGION_SIZE)
+                ),
+            )
+        else:
+            if flip:
+                image = image.rotate(180)
+            # magic/required header
+            data = [DATA_PROGRAMMED_MARKER, 0x00]  # Timing value of 0
+            image_bytes = still_image_to_bytes(
+                image, negative, dither, threshold, preview_filename
+            )
+            data.extend(get_screen_blob([0] * LCD_NUM_BYTES, image_bytes))
+
+    data = pad_to_region(data, deviceSettings.LOGO_REGION_SIZE)
+
     # Split name from extension so we can mangle in the _L suffix for flipped images
     split_name = os.path.splitext(os.path.basename(input_filename))
 
@@ -451,6 +486,14 @@ def parse_commandline():
         help="generate a logo erase file instead of a logo",
     )
 
+    parser.add_argument(
+        "-F",
+        "--full-region",
+        action="store_true",
+        help="let animations use the whole logo region of the device; "
+        "needs firmware that plays back more than 1024 bytes",
+    )
+
     parser.add_argument("-m", "--model", help="device model name")
     parser.add_argument(
         "-v",
@@ -487,6 +530,7 @@ if __name__ == "__main__":
         negative=args.negative,
         make_erase_image=args.erase,
         flip=False,
+        use_full_region=args.full_region,
     )
 
     img2hex(
@@ -500,4 +544,5 @@ if __name__ == "__main__":
         negative=args.negative,
         make_erase_image=args.erase,
         flip=True,
+        use_full_region=args.full_region,
     )